@@ -3,13 +3,130 @@ import os
 import time
 
 import cv2
+import numpy as np
 
-from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QPushButton, QFileDialog, QDialog
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QPushButton, QFileDialog, QDialog, QMessageBox
+from PyQt6.QtCore import Qt, QThread, QMutex, QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt6.QtGui import QImage, QPixmap
 
 from lib.image_preprocessing import ImageProcessing
 
+class CaptureThread(QThread):
+    """
+    Reads frames from the camera off the UI thread and keeps only the newest one.
+    """
+
+    # Emitted when a new frame is waiting; at most one notification is queued at a time
+    frameReady = pyqtSignal()
+
+    def __init__(self, capture: cv2.VideoCapture, parent=None) -> None:
+        super().__init__(parent)
+        self.capture = capture
+
+        # Single-slot mailbox for the latest frame, guarded by a mutex. Frames are decoded
+        # into three reusable buffers: one being written, one waiting in the mailbox and
+        # one held by the UI, so no pixel buffer is allocated per frame.
+        self._mutex = QMutex()
+        self._buffers = [None, None, None]
+        self._mailbox = None
+        self._held = None
+
+        self.paused = False
+
+        # Back-off used when the camera returns no frame (fall back to ~30 fps when
+        # the driver does not report a frame rate)
+        fps = self.capture.get(cv2.CAP_PROP_FPS)
+        self.frame_interval_ms = int(1000 / fps) if fps > 0 else 33
+
+    def run(self) -> None:
+        """
+        This function grabs frames until interruption is requested and posts the newest one to the mailbox.
+        """
+
+        while not self.isInterruptionRequested():
+            if not self.capture.grab():
+                self.msleep(self.frame_interval_ms)
+                continue
+
+            # While paused keep grabbing so the driver buffer stays drained, but skip decoding
+            if self.paused: continue
+
+            # Pick the buffer that is neither waiting in the mailbox nor held by the UI
+            self._mutex.lock()
+            index = next(i for i in range(3) if i != self._mailbox and i != self._held)
+            self._mutex.unlock()
+
+            ret, frame = self.capture.retrieve(self._buffers[index])
+            if not ret: continue
+
+            self._mutex.lock()
+            self._buffers[index] = frame
+            notify = self._mailbox is None
+            self._mailbox = index
+            self._mutex.unlock()
+
+            if notify:
+                self.frameReady.emit()
+
+    def take_latest_frame(self):
+        """
+        Returns the newest frame (or None) and empties the mailbox.
+        The returned buffer is not reused until the next frame is taken.
+        """
+
+        self._mutex.lock()
+        frame = None
+        if self._mailbox is not None:
+            self._held = self._mailbox
+            self._mailbox = None
+            frame = self._buffers[self._held]
+        self._mutex.unlock()
+        return frame
+
+    def stop(self) -> None:
+        """
+        Asks the capture loop to exit and waits for it to finish.
+        """
+
+        self.requestInterruption()
+        self.wait()
+
+class PreprocessingSignals(QObject):
+    """
+    Signals for PreprocessingTask (QRunnable is not a QObject and cannot own signals).
+    """
+
+    # Emitted with the finished ImageProcessing instance
+    finished = pyqtSignal(object)
+
+    # Emitted with an error message when the pipeline raises
+    failed = pyqtSignal(str)
+
+class PreprocessingTask(QRunnable):
+    """
+    Runs ImageProcessing on a thread-pool thread so the UI stays responsive.
+    """
+
+    def __init__(self, processor: ImageProcessing, image) -> None:
+        super().__init__()
+        self.processor = processor
+        self.image = image
+        self.signals = PreprocessingSignals()
+
+    def run(self) -> None:
+        """
+        This function runs the preprocessing pipeline and reports the result back to the UI thread.
+        """
+
+        # An exception escaping run() would abort the application, so report it instead
+        try:
+            self.processor.run_preprocessing(self.image)
+        except Exception as error:
+            self.signals.failed.emit(str(error))
+            return
+
+        self.signals.finished.emit(self.processor)
+
 class UI(QMainWindow):
     def __init__(self) -> None:
         super().__init__()
@@ -26,17 +143,26 @@ class UI(QMainWindow):
 
         # Setup the camera
         self.capture = cv2.VideoCapture(0)
+
+        # Keep only the newest frame in the driver buffer and ask for MJPG so USB
+        # webcams deliver compressed frames. V4L2 (Linux) honours both; MSMF (Windows)
+        # ignores them, in which case these calls are no-ops.
+        self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+
         self.current_frame = None
+        self._qimage_backing = None
+        self._preview_buf = None
 
         # Create a label to display the camera feed
         self.label = QLabel()
         self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
 
-        # setup timer
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_frame)
-        self.timer.start()
+        # setup capture thread; the label is updated whenever it posts a new frame
+        self.capture_thread = CaptureThread(self.capture, self)
+        self.capture_thread.frameReady.connect(self.update_frame)
+        self.capture_thread.start()
 
         # create button layout
         self.button_layout = QHBoxLayout()
@@ -52,35 +178,51 @@ class UI(QMainWindow):
 
         self.processed_image = None
 
+        # One long-lived processor so its working buffers are reused between conversions;
+        # only one PreprocessingTask runs at a time
+        self.processor = ImageProcessing()
+        self._preprocess_task = None
+
     def update_frame(self) -> None:
         """
-        This function captures a frame from the camera and updates the label with the new image.
+        This function takes the latest frame from the capture thread and updates the label with the new image.
         """
 
-        # Capture a frame from the camera
-        ret, frame = self.capture.read()
-        if not ret: return
-
-        # Store the current frame
-        self.current_frame = frame.copy()
-
-        # Convert the frame to RGB format
-        rgb= cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        height, width, channel = rgb.shape
-
-
-        # Create a QImage from the frame
-        bytes_per_line = channel * width
-        q_image = QImage(rgb.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
+        # Take the newest frame; a notification may still arrive after the feed was frozen
+        frame = self.capture_thread.take_latest_frame()
+        if frame is None or self.capture_thread.paused: return
+
+        # Store the current frame. The capture thread does not reuse this buffer until the
+        # next frame is taken, so no copy is needed; take_image copies once when frozen.
+        self.current_frame = frame
+
+        # Nothing to draw while the preview is hidden or the window is minimized
+        if not self.label.isVisible() or self.isMinimized(): return
+
+        # Create a QImage directly on the BGR frame; Qt reads BGR888 natively so no
+        # channel swap is needed. QImage does not own the buffer, so keep it alive, and
+        # pass the real row stride. ascontiguousarray only copies non-contiguous views.
+        self._qimage_backing = np.ascontiguousarray(frame)
+        height, width, _ = self._qimage_backing.shape
+        q_image = QImage(
+            self._qimage_backing.data,
+            width, height,
+            self._qimage_backing.strides[0],
+            QImage.Format.Format_BGR888
+        )
 
+        # Always use QPixmap.fromImage rather than QPixmap(q_image); the constructor
+        # form goes through an extra emulation layer in PyQt on every frame.
         self.label.setPixmap(QPixmap.fromImage(q_image))
 
     def closeEvent(self, event) -> None:
         """
-        This function is called when the window is closed. It releases the camera and stops the timer.
+        This function is called when the window is closed. It stops the capture thread, waits for any
+        running preprocessing task and releases the camera.
         """
+        self.capture_thread.stop()
+        QThreadPool.globalInstance().waitForDone()
         self.capture.release()
-        self.timer.stop()
         super().closeEvent(event)
 
     def addToLayout(self) -> None:
@@ -119,7 +261,9 @@ class UI(QMainWindow):
         # Capture a frame from the camera
         if self.current_frame is None: return
 
-        self.timer.stop()
+        # Take a stable snapshot of the frozen frame
+        self.current_frame = self.current_frame.copy()
+        self.capture_thread.paused = True
 
     def import_image(self) -> None:
         """
@@ -133,23 +277,23 @@ class UI(QMainWindow):
         frame = cv2.imread(path)
 
         if frame is None: return
-        self.current_frame = frame.copy()
-        
-                # Store the current frame
-        self.current_frame = frame.copy()
 
-        # Convert the frame to RGB format
-        rgb= cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        height, width, channel = rgb.shape
-
-
-        # Create a QImage from the frame
-        bytes_per_line = channel * width
-        q_image = QImage(rgb.data, width, height, bytes_per_line, QImage.Format.Format_RGB888)
+        # Store the current frame; imread returns a new array, so it is not copied
+        self.current_frame = frame
+
+        # Create a BGR888 QImage on the frame (see update_frame)
+        self._qimage_backing = np.ascontiguousarray(frame)
+        height, width, _ = self._qimage_backing.shape
+        q_image = QImage(
+            self._qimage_backing.data,
+            width, height,
+            self._qimage_backing.strides[0],
+            QImage.Format.Format_BGR888
+        )
 
         self.label.setPixmap(QPixmap.fromImage(q_image))
 
-        self.timer.stop()
+        self.capture_thread.paused = True
 
     def save_image(self) -> None:
         """
@@ -170,32 +314,60 @@ class UI(QMainWindow):
         This function resets the camera and starts capturing again.
         """
 
-        self.timer.start()
+        self.capture_thread.paused = False
 
     def convert_image(self) -> None:
         """
-        This function processes the current frame and displays the preprocessed image in a popup dialog.
+        This function starts preprocessing the current frame on a worker thread.
+        The result is shown by show_processed_image once it is ready.
         """
 
-        if self.current_frame is None:
+        if self.current_frame is None or self._preprocess_task is not None:
             return
 
-        processor = ImageProcessing(self.current_frame)
-        processor.run_preprocessing()
+        # Hand the worker its own copy so the capture thread can keep updating current_frame
+        self._preprocess_task = PreprocessingTask(self.processor, self.current_frame.copy())
+        self._preprocess_task.signals.finished.connect(self.show_processed_image)
+        self._preprocess_task.signals.failed.connect(self.show_preprocessing_error)
+        self.button_convert_image.setEnabled(False)
+
+        QThreadPool.globalInstance().start(self._preprocess_task)
+
+    def show_preprocessing_error(self, message: str) -> None:
+        """
+        This function re-enables conversion and tells the user that preprocessing failed.
+        """
+
+        self._preprocess_task = None
+        self.button_convert_image.setEnabled(True)
+
+        QMessageBox.warning(self, "Conversion Failed", f"Could not preprocess the image:\n{message}")
+
+    def show_processed_image(self, processor: ImageProcessing) -> None:
+        """
+        This function displays the preprocessed image in a popup dialog.
+        """
+
+        self._preprocess_task = None
+        self.button_convert_image.setEnabled(True)
+
         self.processed_image = processor.get_processed_image()  # uint8, shape=(64, new_w)
 
-        proc_rgb = cv2.cvtColor(self.processed_image, cv2.COLOR_GRAY2RGB)
-        h, w, ch = proc_rgb.shape
-        bytes_per_line = ch * w
+        # Show the single-channel image as Grayscale8, no RGB expansion needed
+        self._preview_buf = np.ascontiguousarray(self.processed_image)  # keep alive while qimg uses it
+        h, w = self._preview_buf.shape
         qimg = QImage(
-            proc_rgb.data,
+            self._preview_buf.data,
             w, h,
-            bytes_per_line,
-            QImage.Format.Format_RGB888
+            self._preview_buf.strides[0],
+            QImage.Format.Format_Grayscale8
         )
 
         popup = QDialog(self)
-        popup.setWindowTitle("Preprocessed Output")
+        if processor.contour_found:
+            popup.setWindowTitle("Preprocessed Output")
+        else:
+            popup.setWindowTitle("Preprocessed Output (no expression detected)")
         popup.setModal(True)
         popup.resize(w + 40, h + 80)  # leave space for the button
 
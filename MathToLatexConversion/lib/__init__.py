@@ -1,2 +1,3 @@
 from . import QT_UI
-from . import image_preprocessing
\ No newline at end of file
+from . import image_preprocessing
+from . import deskew
\ No newline at end of file
@@ -0,0 +1,51 @@
+import cv2
+import numpy as np
+
+# Compiled on first use so importing this module never loads numba
+_warp_nearest = None
+
+def _compile_warp_nearest():
+    """
+    Imports numba and JIT-compiles the nearest-neighbour warp kernel.
+    """
+
+    try:
+        from numba import njit, prange
+    except ImportError as error:
+        raise ImportError(
+            "deskew_numba requires the optional 'numba' package (conda install numba)."
+        ) from error
+
+    @njit(parallel=True, fastmath=True)
+    def warp_nearest(src, inv_m, out):
+        # inv_m maps output pixel coordinates back to source coordinates; borders are replicated
+        h, w = src.shape
+        for y in prange(h):
+            for x in range(w):
+                sx = inv_m[0, 0] * x + inv_m[0, 1] * y + inv_m[0, 2]
+                sy = inv_m[1, 0] * x + inv_m[1, 1] * y + inv_m[1, 2]
+                ix = min(max(int(np.floor(sx + 0.5)), 0), w - 1)
+                iy = min(max(int(np.floor(sy + 0.5)), 0), h - 1)
+                out[y, x] = src[iy, ix]
+        return out
+
+    return warp_nearest
+
+def deskew_numba(binary_img: np.ndarray, angle: float) -> np.ndarray:
+    """
+    Rotates binary_img by angle degrees about its centre, like the cv2.warpAffine step in
+    ImageProcessing.run_preprocessing but with nearest-neighbour sampling.
+    Intended as a hook for custom transforms; the OpenCV path remains the default.
+    Requires numba and raises ImportError when it is not installed.
+    """
+
+    global _warp_nearest
+    if _warp_nearest is None:
+        _warp_nearest = _compile_warp_nearest()
+
+    h, w = binary_img.shape
+    M = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+    inv_m = cv2.invertAffineTransform(M)
+
+    out = np.empty_like(binary_img)
+    return _warp_nearest(np.ascontiguousarray(binary_img), inv_m, out)
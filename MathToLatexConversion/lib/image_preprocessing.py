@@ -1,95 +1,178 @@
+from typing import Final, Optional
+
 import cv2
 import numpy as np
 
+# Preprocessing parameters, fixed at import time
+GAUSSIAN_KSIZE:  Final = 5
+GAUSSIAN_SIGMA:  Final = 1
+THRESHOLD_COLOR: Final = 255
+ADAPT_BLOCK:     Final = 15
+ADAPT_C:         Final = 2
+TARGET_H:        Final = 64
+RESIZE_THRESH:   Final = THRESHOLD_COLOR // 2  # re-binarizes the linearly resized output
+MIN_SKEW_ANGLE:  Final = 0.5  # boxes within this many degrees of axis-aligned are not rotated
+
 class ImageProcessing:
 
-    def __init__(self, image: np.ndarray) -> None:
+    def __init__(self, image: Optional[np.ndarray] = None) -> None:
         self.input_image     = image
 
-        self.gaussian_kernal = 5
-        self.gaussian_sigma  = 1
+        self.gaussian_kernal = GAUSSIAN_KSIZE
+        self.gaussian_sigma  = GAUSSIAN_SIGMA
+
+        # Working buffers, sized on first use and reused while the input size is unchanged
+        self._gray   = None
+        self._blur   = None
+        self._bin    = None
+        self._labels = None
+        self._mask   = None
 
-        self.threshold_color = 255
-        self.block_size      = 15
-        self.constant        = 2
+        self.min_skew_angle = MIN_SKEW_ANGLE
 
-        self.target_h = 64
+        self.threshold_color = THRESHOLD_COLOR
+        self.block_size      = ADAPT_BLOCK
+        self.constant        = ADAPT_C
+
+        self.target_h         = TARGET_H
+        self.resize_threshold = RESIZE_THRESH
 
         self.processed_image = None
+        self.contour_found   = False
 
-    def run_preprocessing(self) -> None:
+    def run_preprocessing(self, image: Optional[np.ndarray] = None) -> None:
         """
+        Runs the pipeline on image (or on the image given to the constructor).
+        The same instance can be reused across images to keep its working buffers;
+        an image passed here is not retained after the call.
+
         1) Convert to grayscale
         2) Apply Gaussian blur
         3) Adaptive threshold (inverted)
-        4) Find largest contour, crop, compute angle from that contour
+        4) Find largest connected component, crop, compute angle from that component
         5) Rotate the cropped patch by the angle
         6) Resize to fixed height
         """
 
+        # Bind parameters to locals once so the pipeline does not repeat attribute lookups
+        ksize            = (self.gaussian_kernal, self.gaussian_kernal)
+        sigma            = self.gaussian_sigma
+        threshold_color  = self.threshold_color
+        block_size       = self.block_size
+        constant         = self.constant
+        min_skew_angle   = self.min_skew_angle
+        target_h         = self.target_h
+        resize_threshold = self.resize_threshold
+
+        if image is None:
+            image = self.input_image
+        if image is None:
+            raise ValueError("No input image. Please pass an image to preprocess.")
+
+        shape = image.shape[:2]
+        if self._gray is None or self._gray.shape != shape:
+            self._gray   = np.empty(shape, dtype=np.uint8)
+            self._blur   = np.empty_like(self._gray)
+            self._bin    = np.empty_like(self._gray)
+            self._labels = np.empty(shape, dtype=np.int32)
+            self._mask   = np.empty_like(self._gray)
+
         # 1) Grayscale
-        gray = cv2.cvtColor(self.input_image, cv2.COLOR_BGR2GRAY)
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=self._gray)
 
-        # 2) Gaussian blur
+        # 2) Gaussian blur (the 8-bit path is already separable, fixed-point SIMD)
         blurred = cv2.GaussianBlur(
             gray,
-            (self.gaussian_kernal, self.gaussian_kernal),
-            self.gaussian_sigma
+            ksize,
+            sigma,
+            dst=self._blur
         )
 
         # 3) Adaptive threshold (white ink on black)
         binary = cv2.adaptiveThreshold(
             blurred,
-            self.threshold_color,
+            threshold_color,
             cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
             cv2.THRESH_BINARY_INV,
-            self.block_size,
-            self.constant
+            block_size,
+            constant,
+            dst=self._bin
         )
 
-        # 4) Find contours, crop to largest
-        contours, _ = cv2.findContours(
+        # 4) Label connected components, crop to largest. One call gives the areas and
+        #    bounding boxes of every component (label 0 is the background).
+        num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(
             binary,
-            cv2.RETR_EXTERNAL,
-            cv2.CHAIN_APPROX_SIMPLE
+            labels=self._labels,
+            connectivity=8
         )
 
-        if contours:
-            largest_contour = max(contours, key=cv2.contourArea)
-            x, y, w, h = cv2.boundingRect(largest_contour)
+        contour_found = num_labels > 1
+
+        if contour_found:
+            idx = 1 + int(stats[1:, cv2.CC_STAT_AREA].argmax())
+            x, y, w, h = stats[idx, :4]
             cropped = binary[y:y+h, x:x+w]
 
-            # Compute angle from the full-image contour
-            rect = cv2.minAreaRect(largest_contour)
+            # Compute angle from the outline of the largest component only, decimated so
+            # minAreaRect sees a handful of vertices rather than every boundary point
+            mask = cv2.compare(
+                labels[y:y+h, x:x+w],
+                idx,
+                cv2.CMP_EQ,
+                dst=self._mask[y:y+h, x:x+w]
+            )
+            outlines, _ = cv2.findContours(
+                mask,
+                cv2.RETR_EXTERNAL,
+                cv2.CHAIN_APPROX_SIMPLE
+            )
+            outline = np.vstack(outlines)
+            epsilon = 0.002 * cv2.arcLength(outline, True)
+            approx = cv2.approxPolyDP(outline, epsilon, True)
+            rect = cv2.minAreaRect(approx)
             angle = rect[-1]
 
-            # Rotate the cropped patch
-            h_crop, w_crop = cropped.shape[:2]
-            center = (w_crop // 2, h_crop // 2)
-            M = cv2.getRotationMatrix2D(center, angle, 1.0)
-            adjusted = cv2.warpAffine(
-                cropped,
-                M,
-                (w_crop, h_crop),
-                flags=cv2.INTER_CUBIC,
-                borderMode=cv2.BORDER_REPLICATE
-            )
+            # Rotate the cropped patch. The patch is binary, so linear interpolation
+            # gives the same result as cubic at a quarter of the taps. minAreaRect reports
+            # an axis-aligned box as 0 or 90 depending on the OpenCV version (-90 on older
+            # releases), so a box near either end needs no rotation.
+            skew = abs(angle) % 90.0
+            if min(skew, 90.0 - skew) < min_skew_angle:
+                adjusted = cropped
+            else:
+                h_crop, w_crop = cropped.shape[:2]
+                center = (w_crop // 2, h_crop // 2)
+                M = cv2.getRotationMatrix2D(center, angle, 1.0)
+                adjusted = cv2.warpAffine(
+                    cropped,
+                    M,
+                    (w_crop, h_crop),
+                    flags=cv2.INTER_LINEAR,
+                    borderMode=cv2.BORDER_REPLICATE
+                )
         else:
+            # Nothing detected; the whole frame is only scaled down for display
             adjusted = binary
 
-        # 6) Resize to fixed height (self.target_h), maintain aspect ratio
+        # 6) Resize to fixed height (target_h), maintain aspect ratio
         h0, w0 = adjusted.shape
         if h0 == 0 or w0 == 0:
-            output = np.zeros((self.target_h, self.target_h), dtype=np.uint8)
+            output = np.zeros((target_h, target_h), dtype=np.uint8)
         else:
-            scale = self.target_h / float(h0)
-            new_w = int(w0 * scale)
+            scale = target_h / float(h0)
+            new_w = max(1, int(w0 * scale))  # very tall, thin crops would otherwise round to 0
             output = cv2.resize(
                 adjusted,
-                (new_w, self.target_h),
-                interpolation=cv2.INTER_AREA
+                (new_w, target_h),
+                interpolation=cv2.INTER_LINEAR if contour_found else cv2.INTER_NEAREST
             )
 
+            # Linear resampling leaves grey edges; re-threshold at mid-grey to keep the strokes crisp
+            if contour_found:
+                cv2.threshold(output, resize_threshold, threshold_color, cv2.THRESH_BINARY, dst=output)
+
+        self.contour_found   = contour_found
         self.processed_image = output
 
     def get_processed_image(self) -> np.ndarray:
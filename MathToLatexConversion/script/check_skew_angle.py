@@ -0,0 +1,67 @@
+"""
+Compares the skew angle that ImageProcessing computes from the decimated outline of a
+component against minAreaRect over every pixel of that component, on synthetic rotated
+shapes, and times both.
+
+usage: python script/check_skew_angle.py
+"""
+
+import timeit
+
+import cv2
+import numpy as np
+
+def make_component(angle: float, seed: int) -> np.ndarray:
+    """
+    Draws a handwriting-like line (a baseline stroke with random glyph blobs), rotated by angle.
+    """
+
+    rng = np.random.default_rng(seed)
+    img = np.zeros((600, 1400), dtype=np.uint8)
+    cv2.line(img, (150, 330), (1250, 330), 255, 6)
+    for x in range(170, 1230, 45):
+        pts = np.column_stack((
+            x + rng.integers(-20, 20, 8),
+            300 + rng.integers(-60, 30, 8)
+        )).astype(np.int32)
+        cv2.polylines(img, [pts], False, 255, 5)
+
+    M = cv2.getRotationMatrix2D((700, 300), angle, 1.0)
+    rotated = cv2.warpAffine(img, M, (1400, 600), flags=cv2.INTER_NEAREST)
+
+    # Keep the largest component only, as run_preprocessing does
+    _, labels, stats, _ = cv2.connectedComponentsWithStats(rotated, connectivity=8)
+    idx = 1 + int(stats[1:, cv2.CC_STAT_AREA].argmax())
+    return cv2.compare(labels, idx, cv2.CMP_EQ)
+
+def angle_all_pixels(mask: np.ndarray) -> float:
+    ys, xs = np.nonzero(mask)
+    return cv2.minAreaRect(np.column_stack((xs, ys)).astype(np.int32))[-1]
+
+def angle_outline(mask: np.ndarray) -> float:
+    outlines, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    outline = np.vstack(outlines)
+    epsilon = 0.002 * cv2.arcLength(outline, True)
+    approx = cv2.approxPolyDP(outline, epsilon, True)
+    return cv2.minAreaRect(approx)[-1]
+
+def main() -> None:
+    worst = 0.0
+    t_pixels = t_outline = 0.0
+    for seed, angle in enumerate((-12.0, -5.0, -2.0, -0.7, 0.0, 0.7, 2.0, 5.0, 12.0)):
+        mask = make_component(angle, seed)
+        a_pixels = angle_all_pixels(mask)
+        a_outline = angle_outline(mask)
+        diff = abs(a_pixels - a_outline)
+        diff = min(diff, 90.0 - diff)
+        worst = max(worst, diff)
+
+        t_pixels += min(timeit.repeat(lambda: angle_all_pixels(mask), number=20, repeat=3)) / 20
+        t_outline += min(timeit.repeat(lambda: angle_outline(mask), number=20, repeat=3)) / 20
+        print(f"rotation {angle:6.1f}: all pixels {a_pixels:7.3f}, outline {a_outline:7.3f}, diff {diff:.3f}")
+
+    print(f"max angle difference: {worst:.3f} deg")
+    print(f"all pixels: {t_pixels * 1e3 / 9:.3f} ms/call, outline: {t_outline * 1e3 / 9:.3f} ms/call")
+
+if __name__ == "__main__":
+    main()